@@ -1,4 +1,11 @@
+import atexit
+import itertools
+import os
+import shutil
+import tempfile
+import time
 import tkinter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from tkinter import ttk
 from tkinter import filedialog as fd
 from PIL import ImageTk, Image
@@ -22,6 +29,30 @@ moge_model = MoGeModel.from_pretrained("Ruicheng/moge-vitl").to(device)
 #Load decomposition model
 int_model = load_models('v2')
 
+#Batching settings for MoGe
+BATCH_PAD_TOL = 0.05
+BENCHMARK_BATCH_SIZES = [1, 2, 4, 8, 16]
+
+#Sequence settings, keyframes are taken when the mean grayscale change
+#of a thumbnail since the last keyframe exceeds the threshold
+SEQUENCE_IMAGE_EXTS = ['.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff']
+SEQUENCE_THUMB_WIDTH = 64
+SEQUENCE_KEY_THRESHOLD = 0.03
+SEQUENCE_MAX_KEY_INTERVAL = 30
+SEQUENCE_MAX_PENDING = 8
+
+#Meshing settings, vertices are flipped into Blender's axes
+MESH_FLIP = np.array([1, -1, -1], dtype=np.float32)
+MESH_WORKERS = os.cpu_count() or 1
+MESH_MIN_BAND = 64
+MESH_BENCHMARK_MEGAPIXELS = [12, 25, 50]
+
+#Tiling settings for intrinsic decomposition of large images
+TILE_MIN_PIXELS = 16_000_000
+TILE_SIZE = 1024
+TILE_OVERLAP = 128
+TILE_IN_FLIGHT = 2
+
 #Set global variables
 target_img = None
 target_cv = []
@@ -31,6 +62,19 @@ fov_y = None
 logo_img = None
 final_img = None
 
+#Last decomposition and logo placement, kept for incremental recompositing
+LOGO_SCALE_STEP = 1.1
+decomp = None
+preview_arr = None
+logo_sprite = None
+logo_center = None
+logo_scale = 1.0
+logo_cache = (None, None)
+drag_pos = None
+
+#Folder for memory mapped decomposition layers, removed on exit
+tile_dir = tempfile.mkdtemp(prefix='logo_insertion_')
+
 #Create window
 window = tkinter.Tk()
 window.title("Image decomposition and compositing")
@@ -92,12 +136,249 @@ def load_target():
     target_img = t_img
     global target_cv
     target_cv = cv2.cvtColor(cv2.imread(fp),cv2.COLOR_BGR2RGB)
+    #Previous decomposition and result belong to the old target
+    global decomp, final_img
+    release_layers(decomp)
+    decomp = None
+    final_img = None
     #Display Preview
     global preview_img
     preview_img = img_resize(t_img)
     panel.config(image=preview_img)
     info.config(text="Image Loaded")
 
+def image_to_tensor(img):
+    """Converts an RGB uint8 image into a (3, H, W) float tensor on the device"""
+    return torch.tensor(img / 255, dtype=torch.float32, device=device).permute(2, 0, 1)
+
+def mesh_from_geometry_reference(input_image, points, depth, mask):
+    """
+    Builds a textured triangle mesh from a MoGe point map with utils3d
+    one full-size step at a time. Kept to check and benchmark the
+    fused mesh_from_geometry against
+    Returns faces, vertices and uvs ready to be saved
+    """
+    normals, normals_mask = utils3d.numpy.points_to_normals(points, mask=mask)
+    height, width = input_image.shape[:2]
+    faces, vertices, vertex_colors, vertex_uvs = utils3d.numpy.image_mesh(
+        points,
+        input_image.astype(np.float32) / 255,
+        utils3d.numpy.image_uv(width=width, height=height),
+        mask=mask & ~(utils3d.numpy.depth_edge(depth, rtol=0.03, mask=mask) & utils3d.numpy.normals_edge(normals,tol=5,mask=normals_mask)),
+        tri=True
+    )
+    vertices, vertex_uvs = vertices * [1, -1, -1], vertex_uvs * [1, -1] + [0, 1]
+    return faces, vertices, vertex_uvs
+
+def window_max(a, fill):
+    """
+    Returns the maximum over the 3x3 window around every pixel of a
+    NaN is skipped unless the whole window is NaN, like nanmax in the
+    max_pool_2d of utils3d
+    """
+    a = np.pad(a, 1, constant_values=fill)
+    a = np.fmax(np.fmax(a[:-2], a[1:-1]), a[2:])
+    return np.fmax(np.fmax(a[:, :-2], a[:, 1:-1]), a[:, 2:])
+
+def cross(a, b):
+    """Cross product over the last axis without the overhead of np.cross"""
+    return np.stack([a[..., 1] * b[..., 2] - a[..., 2] * b[..., 1],
+                     a[..., 2] * b[..., 0] - a[..., 0] * b[..., 2],
+                     a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]], axis=-1)
+
+def mesh_mask_band(points, depth, mask, valid, r0, r1):
+    """
+    Computes which pixels of rows r0 to r1 are kept in the mesh and writes
+    them into valid. Does the work of points_to_normals, depth_edge and
+    normals_edge from utils3d on the band plus the 3 rows around it
+    """
+    height = mask.shape[0]
+    a, b = max(0, r0 - 3), min(height, r1 + 3)
+    h, w = b - a, mask.shape[1]
+
+    #Normals from the four neighbours of each pixel
+    pts = np.zeros((h + 2, w + 2, 3), dtype=points.dtype)
+    pts[1:-1, 1:-1] = points[a:b]
+    m = np.zeros((h + 2, w + 2), dtype=bool)
+    m[1:-1, 1:-1] = mask[a:b]
+    normals = np.zeros((h, w, 3), dtype=np.float32)
+    normals_mask = np.zeros((h, w), dtype=bool)
+    #MoGe fills masked points with inf, which leaves NaN in the normals next
+    #to them the same way it does in utils3d
+    with np.errstate(invalid='ignore'):
+        center = pts[1:-1, 1:-1]
+        up, left = pts[:-2, 1:-1] - center, pts[1:-1, :-2] - center
+        down, right = pts[2:, 1:-1] - center, pts[1:-1, 2:] - center
+        for v1, v2, m1, m2 in [(up, left, m[:-2, 1:-1], m[1:-1, :-2]),
+                               (left, down, m[1:-1, :-2], m[2:, 1:-1]),
+                               (down, right, m[2:, 1:-1], m[1:-1, 2:]),
+                               (right, up, m[1:-1, 2:], m[:-2, 1:-1])]:
+            n = cross(v1, v2)
+            n /= np.linalg.norm(n, axis=-1, keepdims=True) + 1e-12
+            ok = m1 & m2 & m[1:-1, 1:-1]
+            normals += n * ok[..., None]
+            normals_mask |= ok
+        normals /= np.linalg.norm(normals, axis=-1, keepdims=True) + 1e-12
+    normals[~normals_mask] = 0
+
+    #Depth edges, relative depth range over the kept 3x3 neighbours
+    m = m[1:-1, 1:-1]
+    d = depth[a:b]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diff = window_max(np.where(m, d, -np.inf), -np.inf) + window_max(np.where(m, -d, -np.inf), -np.inf)
+        depth_edges = np.nan_to_num(diff / d) > 0.03
+
+    #Normal edges, largest angle to a 3x3 neighbour widened by one pixel
+    #Uses the same float32 ops as utils3d, arccos is not clipped so a dot
+    #product just above 1 gives NaN, which wins the max over the window
+    #and is then skipped by the widening
+    with np.errstate(invalid='ignore'):
+        normals = normals / (np.linalg.norm(normals, axis=-1, keepdims=True) + 1e-12)
+        n_pad = np.pad(normals, ((1, 1), (1, 1), (0, 0)), mode='edge')
+        m_pad = np.pad(normals_mask, 1, mode='edge')
+        angle = np.zeros((h, w), dtype=np.float32)
+        for dy in range(3):
+            for dx in range(3):
+                n = n_pad[dy:dy + h, dx:dx + w]
+                dot = normals[..., 0] * n[..., 0] + normals[..., 1] * n[..., 1] + normals[..., 2] * n[..., 2]
+                np.maximum(angle, np.where(m_pad[dy:dy + h, dx:dx + w], np.arccos(dot), 0), out=angle)
+        normal_edges = window_max(angle, -np.inf) > np.deg2rad(5)
+
+    keep = m & ~(depth_edges & normal_edges)
+    valid[r0:r1] = keep[r0 - a:r1 - a]
+
+def mesh_count_band(valid, referenced, r0, r1):
+    """
+    Finds the quads of rows r0 to r1 that have all four corners kept and
+    writes which pixels of the band are used by any quad into referenced
+    Returns the quad mask of the band and the number of used pixels
+    """
+    height, width = valid.shape
+    #Kept pixels of rows r0 - 1 to r1, rows outside the image are not kept
+    v = np.zeros((r1 - r0 + 2, width), dtype=bool)
+    a, b = max(r0 - 1, 0), min(r1 + 1, height)
+    v[a - (r0 - 1):b - (r0 - 1)] = valid[a:b]
+    #Row k holds the quads between pixel rows r0 - 1 + k and r0 + k
+    quads = v[:-1, :-1] & v[1:, :-1] & v[1:, 1:] & v[:-1, 1:]
+    q = np.pad(quads, ((0, 0), (1, 1)))
+    referenced[r0:r1] = q[:-1, :-1] | q[:-1, 1:] | q[1:, :-1] | q[1:, 1:]
+    return quads[1:], np.count_nonzero(referenced[r0:r1])
+
+def mesh_write_band(points, referenced, quads, vertices, uvs, faces, v_off, f_off, r0, r1):
+    """
+    Writes the flipped vertices and uvs of the used pixels of rows r0 to r1
+    and the two triangles of each of its quads into the preallocated
+    arrays, starting at vertex v_off and face f_off
+    """
+    height, width = referenced.shape
+    ys, xs = np.nonzero(referenced[r0:r1])
+    n = len(ys)
+    np.multiply(points[r0:r1][ys, xs], MESH_FLIP, out=vertices[v_off:v_off + n])
+    uvs[v_off:v_off + n, 0] = (xs + 0.5) / width
+    uvs[v_off:v_off + n, 1] = 1 - (ys + r0 + 0.5) / height
+
+    #Vertex index of every used pixel of the band and the row below it
+    index = np.cumsum(referenced[r0:min(r1 + 1, height)], dtype=np.int32).reshape(-1, width) - 1 + v_off
+    qy, qx = np.nonzero(quads)
+    tris = faces[f_off:f_off + 2 * len(qy)].reshape(-1, 2, 3)
+    tris[:, 0, 0] = tris[:, 1, 0] = index[qy, qx]
+    tris[:, 0, 1] = index[qy + 1, qx]
+    tris[:, 0, 2] = tris[:, 1, 1] = index[qy + 1, qx + 1]
+    tris[:, 1, 2] = index[qy, qx + 1]
+
+def mesh_from_geometry(points, depth, mask):
+    """
+    Builds a textured triangle mesh from a MoGe point map
+    Pixels on depth and normal discontinuities are removed so the
+    foreground does not get stretched onto the background
+    Follows the steps of mesh_from_geometry_reference in one fused pass
+    over bands of rows spread across all cores, writing straight into
+    preallocated arrays and skipping the unused vertex colors
+    benchmark_meshing checks that both give the same mesh
+    Returns faces, vertices and uvs ready to be saved
+    """
+    height, width = mask.shape
+    band = max(MESH_MIN_BAND, -(-height // (4 * MESH_WORKERS)))
+    bands = [(r0, min(r0 + band, height)) for r0 in range(0, height, band)]
+    valid = np.empty((height, width), dtype=bool)
+    referenced = np.empty((height, width), dtype=bool)
+    with ThreadPoolExecutor(max_workers=MESH_WORKERS) as pool:
+        list(pool.map(lambda r: mesh_mask_band(points, depth, mask, valid, *r), bands))
+        counts = list(pool.map(lambda r: mesh_count_band(valid, referenced, *r), bands))
+
+        #Offsets of each band in the output arrays
+        v_counts = [c[1] for c in counts]
+        f_counts = [2 * np.count_nonzero(c[0]) for c in counts]
+        v_offs = np.concatenate([[0], np.cumsum(v_counts)])
+        f_offs = np.concatenate([[0], np.cumsum(f_counts)])
+        vertices = np.empty((v_offs[-1], 3), dtype=np.float32)
+        uvs = np.empty((v_offs[-1], 2), dtype=np.float32)
+        faces = np.empty((f_offs[-1], 3), dtype=np.int32)
+
+        list(pool.map(lambda k: mesh_write_band(points, referenced, counts[k][0], vertices, uvs, faces, v_offs[k], f_offs[k], *bands[k]), range(len(bands))))
+    return faces, vertices, uvs
+
+def benchmark_meshing():
+    """
+    Times the fused mesh_from_geometry against the utils3d reference on
+    synthetic point maps of MESH_BENCHMARK_MEGAPIXELS and checks that
+    both give the same mesh. Masked pixels are filled with inf as MoGe
+    does, including holes along the box edge so NaN normals are covered
+    Results are printed and shown in the status line
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for mp in MESH_BENCHMARK_MEGAPIXELS:
+        #A tilted plane with a box in front of it, 4:3 aspect ratio
+        width = int(np.sqrt(mp * 1e6 * 4 / 3))
+        height = int(width * 3 / 4)
+        u, v = np.meshgrid(np.linspace(-1, 1, width, dtype=np.float32), np.linspace(-0.75, 0.75, height, dtype=np.float32))
+        depth = 5 + u
+        depth[height // 3:2 * height // 3, width // 3:2 * width // 3] = 2
+        points = np.stack([u * depth, v * depth, depth], axis=-1)
+        mask = np.ones((height, width), dtype=bool)
+        mask[:height // 20] = False
+        #Scattered holes in a band around the box edge
+        y0, y1, x0, x1 = height // 3 - 8, 2 * height // 3 + 8, width // 3 - 8, width // 3 + 8
+        mask[y0:y1, x0:x1] &= rng.random((y1 - y0, x1 - x0)) > 0.05
+        depth[~mask] = np.inf
+        points[~mask] = np.inf
+
+        start = time.perf_counter()
+        faces, vertices, uvs = mesh_from_geometry(points, depth, mask)
+        fused_time = time.perf_counter() - start
+        line = str(mp) + " MP: fused " + str(round(fused_time, 2)) + "s"
+        try:
+            start = time.perf_counter()
+            with np.errstate(invalid='ignore'):
+                ref_faces, ref_vertices, ref_uvs = mesh_from_geometry_reference(np.zeros((height, width, 3), dtype=np.uint8), points, depth, mask)
+            ref_time = time.perf_counter() - start
+            same = np.array_equal(faces, ref_faces) and np.allclose(vertices, ref_vertices) and np.allclose(uvs, ref_uvs, atol=1e-6)
+            line += ", reference " + str(round(ref_time, 2)) + "s, " + ("same mesh" if same else "MESH DIFFERS")
+            del ref_faces, ref_vertices, ref_uvs
+        except MemoryError:
+            line += ", reference out of memory"
+        del faces, vertices, uvs, points, depth, mask, u, v
+        print(line)
+        results.append(line)
+        info.config(text="\n".join(results))
+        window.update_idletasks()
+
+def fov_from_intrinsics(intrinsics, width, height):
+    """
+    Converts normalized intrinsics into the camera FOV in degrees
+    Returns the horizontal and vertical FOV and the FOV along the
+    longest side of the image, which is the one Blender expects
+    """
+    fov_x, fov_y = utils3d.numpy.intrinsics_to_fov(intrinsics)
+    fov_x,fov_y = round(np.rad2deg(fov_x),3), round(np.rad2deg(fov_y),3)
+
+    if width > height:
+        fov = fov_x
+    else:
+        fov = fov_y
+    return fov_x, fov_y, fov
+
 def build_geometry():
     """Runs MoGe to convert image to 3D model"""
     if len(target_cv) == 0:
@@ -106,26 +387,18 @@ def build_geometry():
     #Prepare Image
     info.config(text="Preparing Image")
     input_image = target_cv
-    input_image_t = torch.tensor(input_image / 255, dtype=torch.float32, device=device).permute(2, 0, 1)
+    input_image_t = image_to_tensor(input_image)
 
     #Run Model
     info.config(text="Getting Point Map")
     output = moge_model.infer(input_image_t)
 
     points, depth, mask, intrinsics = output['points'].cpu().numpy(), output['depth'].cpu().numpy(), output['mask'].cpu().numpy(), output['intrinsics'].cpu().numpy()
-    normals, normals_mask = utils3d.numpy.points_to_normals(points, mask=mask)
 
     #Get Mesh
     info.config(text="Getting Mesh")
     height, width = input_image.shape[:2]
-    faces, vertices, vertex_colors, vertex_uvs = utils3d.numpy.image_mesh(
-        points,
-        input_image.astype(np.float32) / 255,
-        utils3d.numpy.image_uv(width=width, height=height),
-        mask=mask & ~(utils3d.numpy.depth_edge(depth, rtol=0.03, mask=mask) & utils3d.numpy.normals_edge(normals,tol=5,mask=normals_mask)),
-        tri=True
-    )
-    vertices, vertex_uvs = vertices * [1, -1, -1], vertex_uvs * [1, -1] + [0, 1]
+    faces, vertices, vertex_uvs = mesh_from_geometry(points, depth, mask)
 
     #Save result
     info.config(text="Saving Mesh")
@@ -134,16 +407,191 @@ def build_geometry():
 
     #Get FOV
     global fov_x, fov_y
-    fov_x, fov_y = utils3d.numpy.intrinsics_to_fov(intrinsics)
-    fov_x,fov_y = round(np.rad2deg(fov_x),3), round(np.rad2deg(fov_y),3)
-
-    if width > height:
-        fov = fov_x
-    else:
-        fov = fov_y
+    fov_x, fov_y, fov = fov_from_intrinsics(intrinsics, width, height)
 
     info.config(text="Mesh Saved. FOV Is: " + str(fov))
 
+def bucket_by_resolution(shapes, batch_size, pad_tol=BATCH_PAD_TOL):
+    """
+    Groups images of similar resolution into batches for MoGe
+    Images are ordered by aspect ratio and size so that neighbours can share
+    a batch. A new batch is started once it is full or once padding one of
+    its images up to the batch resolution would grow it by more than pad_tol
+    Returns a list of batches, each a list of indices into shapes
+    """
+    order = sorted(range(len(shapes)), key=lambda i: (shapes[i][1] / shapes[i][0], shapes[i][0], shapes[i][1]))
+    batches = []
+    batch = []
+    batch_h, batch_w = 0, 0
+    for i in order:
+        h, w = shapes[i]
+        new_h, new_w = max(batch_h, h), max(batch_w, w)
+        fits = all(new_h <= shapes[j][0] * (1 + pad_tol) and new_w <= shapes[j][1] * (1 + pad_tol) for j in batch + [i])
+        if batch and (len(batch) == batch_size or not fits):
+            batches.append(batch)
+            batch = []
+            new_h, new_w = h, w
+        batch.append(i)
+        batch_h, batch_w = new_h, new_w
+    if batch:
+        batches.append(batch)
+    return batches
+
+def crop_intrinsics(intrinsics, top, left, height, width, pad_height, pad_width):
+    """
+    Converts normalized intrinsics predicted for a padded image back
+    to the normalized intrinsics of the original image inside it
+    """
+    intrinsics = intrinsics.copy()
+    intrinsics[0, 0] = intrinsics[0, 0] * pad_width / width
+    intrinsics[1, 1] = intrinsics[1, 1] * pad_height / height
+    intrinsics[0, 2] = (intrinsics[0, 2] * pad_width - left) / width
+    intrinsics[1, 2] = (intrinsics[1, 2] * pad_height - top) / height
+    return intrinsics
+
+def infer_geometry_batches(paths, batch_size, pad_tol=BATCH_PAD_TOL):
+    """
+    Runs MoGe on many images using batched forward passes
+    Images are bucketed by resolution, padded symmetrically up to the
+    largest image of their batch and the outputs are cropped back per image
+    Only one batch of images is held in memory at a time
+    Yields (index, image, points, depth, mask, intrinsics) for every image
+    as soon as its batch finishes, then the batch timing as
+    (None, batch length, seconds)
+    """
+    shapes = []
+    for fp in paths:
+        with Image.open(fp) as img:
+            shapes.append((img.size[1], img.size[0]))
+
+    for batch in bucket_by_resolution(shapes, batch_size, pad_tol):
+        images = [cv2.cvtColor(cv2.imread(paths[i]),cv2.COLOR_BGR2RGB) for i in batch]
+        pad_h = max(img.shape[0] for img in images)
+        pad_w = max(img.shape[1] for img in images)
+
+        #Pad every image of the batch to the same size
+        start = time.perf_counter()
+        offsets = []
+        tensors = []
+        for img in images:
+            h, w = img.shape[:2]
+            top, left = (pad_h - h) // 2, (pad_w - w) // 2
+            offsets.append((top, left))
+            t = image_to_tensor(img)[None]
+            t = torch.nn.functional.pad(t, (left, pad_w - w - left, top, pad_h - h - top), mode='replicate')
+            tensors.append(t)
+        output = moge_model.infer(torch.cat(tensors))
+        points, depth, mask, intrinsics = output['points'].cpu().numpy(), output['depth'].cpu().numpy(), output['mask'].cpu().numpy(), output['intrinsics'].cpu().numpy()
+        seconds = time.perf_counter() - start
+
+        #Split the batch back into its images
+        for k, i in enumerate(batch):
+            h, w = images[k].shape[:2]
+            top, left = offsets[k]
+            yield (i, images[k],
+                   points[k, top:top + h, left:left + w],
+                   depth[k, top:top + h, left:left + w],
+                   mask[k, top:top + h, left:left + w],
+                   crop_intrinsics(intrinsics[k], top, left, h, w, pad_h, pad_w))
+        yield None, len(batch), seconds
+
+def save_batch_mesh(save_dir, name, image, points, depth, mask, intrinsics):
+    """Builds and saves the mesh of one image as <name>_mesh.glb, returns its FOV"""
+    faces, vertices, vertex_uvs = mesh_from_geometry(points, depth, mask)
+    save_glb(os.path.join(save_dir, name + '_mesh.glb'), vertices, faces, vertex_uvs, image)
+    height, width = image.shape[:2]
+    return fov_from_intrinsics(intrinsics, width, height)[2]
+
+def build_geometry_batch():
+    """
+    Runs MoGe on several target images at once and saves a mesh for each
+    Meshes are built on a worker thread while the next batch is inferred
+    The FOV of every mesh is written next to them in fov.txt
+    """
+    #Check batch size before asking for any files
+    try:
+        batch_size = int(batch_size_box.get())
+    except ValueError:
+        batch_size = 0
+    if batch_size < 1:
+        info.config(text="Error: Batch Size Should be a Whole Number Above 0")
+        return
+    paths = fd.askopenfilenames()
+    if len(paths) == 0:
+        info.config(text="Error: No Images Selected")
+        return
+    save_dir = fd.askdirectory()
+    if not save_dir:
+        info.config(text="Error: No Save Folder Selected")
+        return
+
+    fovs = {}
+    pending = []
+    done = 0
+    infer_time = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for i, *result in infer_geometry_batches(paths, batch_size):
+            if i is None:
+                infer_time += result[1]
+                info.config(text="Got Point Maps For " + str(done) + "/" + str(len(paths)) + " Images")
+                window.update_idletasks()
+                continue
+            done += 1
+            pending.append((i, pool.submit(save_batch_mesh, save_dir, os.path.splitext(os.path.basename(paths[i]))[0], *result)))
+            #Bound the number of meshes waiting to be built
+            while len(pending) > 2 * batch_size:
+                j, future = pending.pop(0)
+                fovs[j] = future.result()
+        for j, future in pending:
+            fovs[j] = future.result()
+    total_time = time.perf_counter() - start
+
+    with open(os.path.join(save_dir, 'fov.txt'), 'w') as f:
+        for j in sorted(fovs):
+            f.write(os.path.basename(paths[j]) + " " + str(fovs[j]) + "\n")
+
+    info.config(text=str(len(paths)) + " Meshes Saved. Batch Size " + str(batch_size) + ": "
+                + str(round(len(paths) / infer_time, 2)) + " img/s Inference, "
+                + str(round(len(paths) / total_time, 2)) + " img/s Total")
+
+def benchmark_batch_sizes():
+    """
+    Measures MoGe throughput for several batch sizes on the selected images
+    Nothing is saved, results are printed and shown in the status line
+    so the batch size can be tuned for the machine
+    """
+    paths = fd.askopenfilenames()
+    if len(paths) == 0:
+        info.config(text="Error: No Images Selected")
+        return
+
+    #Untimed pass so CUDA start-up is not counted against the first batch size
+    info.config(text="Warming Up")
+    window.update_idletasks()
+    moge_model.infer(image_to_tensor(cv2.cvtColor(cv2.imread(paths[0]),cv2.COLOR_BGR2RGB)))
+
+    results = []
+    for batch_size in BENCHMARK_BATCH_SIZES:
+        if batch_size > len(paths):
+            break
+        count = 0
+        infer_time = 0
+        try:
+            for i, *result in infer_geometry_batches(paths, batch_size):
+                if i is None:
+                    count += result[0]
+                    infer_time += result[1]
+        except torch.cuda.OutOfMemoryError:
+            torch.cuda.empty_cache()
+            print("Batch size " + str(batch_size) + ": out of memory")
+            break
+        ips = round(count / infer_time, 2)
+        print("Batch size " + str(batch_size) + ": " + str(ips) + " img/s")
+        results.append(str(batch_size) + ": " + str(ips))
+        info.config(text="Batch Size -> img/s\n" + "\n".join(results))
+        window.update_idletasks()
+
 def logo_get():
     """
     Loads an image as the logo to be inserted
@@ -161,10 +609,239 @@ def logo_get():
     logo_img = t_img
     info.config(text="Logo Loaded")
 
+def decompose(img):
+    """
+    Runs intrinsic decomposition on an RGB uint8 image
+    Images above TILE_MIN_PIXELS are decomposed in tiles into arrays on disk
+    Returns the albedo, diffuse shading and residual layers
+    """
+    width, height = img.size if isinstance(img, Image.Image) else img.shape[1::-1]
+    if width * height > TILE_MIN_PIXELS:
+        return decompose_tiled(img, new_tile_dir())
+    i_img = np.array(img).astype(np.single)
+    i_img = i_img / float((2 ** 8) - 1)
+    decomp_results = run_pipeline(int_model,i_img,device='cuda',resize_conf=None,linear=False)
+    return decomp_results['hr_alb'], decomp_results['dif_shd'], decomp_results['residual']
+
+def new_tile_dir():
+    """
+    Creates a folder for the layers of a tiled decomposition
+    It is removed by release_layers once the layers are no longer needed
+    """
+    return tempfile.mkdtemp(prefix='decomp_', dir=tile_dir)
+
+def release_layers(layers):
+    """
+    Closes memory mapped decomposition layers and removes their folder
+    Files that are still mapped cannot be deleted on Windows, so the maps are
+    closed first. The layers must not be used afterwards. Layers held in
+    memory, or None, are left alone
+    """
+    if layers is None:
+        return
+    folders = set()
+    for layer in layers:
+        if isinstance(layer, np.memmap) and layer._mmap is not None:
+            folders.add(os.path.dirname(layer.filename))
+            layer._mmap.close()
+    for folder in folders:
+        shutil.rmtree(folder, ignore_errors=True)
+
+def cleanup_tiles():
+    """Releases the last decomposition and removes the tile folder on exit"""
+    global decomp
+    layers = decomp
+    decomp = None
+    release_layers(layers)
+    shutil.rmtree(tile_dir, ignore_errors=True)
+
+def tile_starts(size, tile, overlap):
+    """Returns the start of every tile along one axis, the last tile ends at size"""
+    if size <= tile:
+        return [0]
+    starts = list(range(0, size - tile, tile - overlap))
+    return starts + [size - tile]
+
+def tile_weight(length, overlap):
+    """Returns a ramp that feathers a tile edge across the overlap"""
+    i = np.arange(length, dtype=np.float32)
+    return np.clip(np.minimum(i + 0.5, length - i - 0.5) / overlap, 1e-3, 1)
+
+def decompose_tile(img, y0, y1, x0, x1):
+    """Runs intrinsic decomposition on one tile of an RGB uint8 image"""
+    i_img = img[y0:y1, x0:x1].astype(np.single)
+    i_img = i_img / float((2 ** 8) - 1)
+    decomp_results = run_pipeline(int_model,i_img,device='cuda',resize_conf=None,linear=False)
+    return decomp_results['hr_alb'], decomp_results['dif_shd']
+
+def decompose_tiled(img, out_dir, tile=TILE_SIZE, overlap=TILE_OVERLAP, in_flight=TILE_IN_FLIGHT):
+    """
+    Runs intrinsic decomposition on overlapping tiles of an RGB uint8 image so
+    peak memory depends on the tile size rather than on the image size
+    At most in_flight tiles are decomposed at once. Albedo and shading of the
+    tiles are blended with feathered weights into memory mapped arrays in
+    out_dir, then the residual is derived from the blended layers so the
+    reconstruction has no seams
+    Returns the albedo, diffuse shading and residual as memory mapped arrays
+    """
+    img = np.asarray(img)[..., :3]
+    height, width = img.shape[:2]
+    alb = np.lib.format.open_memmap(os.path.join(out_dir, 'alb.npy'), mode='w+', dtype=np.float32, shape=(height, width, 3))
+    dif = np.lib.format.open_memmap(os.path.join(out_dir, 'dif.npy'), mode='w+', dtype=np.float32, shape=(height, width, 3))
+    res = np.lib.format.open_memmap(os.path.join(out_dir, 'res.npy'), mode='w+', dtype=np.float32, shape=(height, width, 3))
+    weight = np.lib.format.open_memmap(os.path.join(out_dir, 'weight.npy'), mode='w+', dtype=np.float32, shape=(height, width))
+
+    #Decompose tiles with a bounded number in flight, blending each as it finishes
+    boxes = [(y0, min(y0 + tile, height), x0, min(x0 + tile, width))
+             for y0 in tile_starts(height, tile, overlap) for x0 in tile_starts(width, tile, overlap)]
+    pending = {}
+    done = 0
+    with ThreadPoolExecutor(max_workers=in_flight) as pool:
+        while boxes or pending:
+            while boxes and len(pending) < in_flight:
+                box = boxes.pop(0)
+                pending[pool.submit(decompose_tile, img, *box)] = box
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                y0, y1, x0, x1 = pending.pop(future)
+                t_alb, t_dif = future.result()
+                w = tile_weight(y1 - y0, overlap)[:, None] * tile_weight(x1 - x0, overlap)[None, :]
+                alb[y0:y1, x0:x1] += t_alb * w[..., None]
+                dif[y0:y1, x0:x1] += t_dif * w[..., None]
+                weight[y0:y1, x0:x1] += w
+                done += 1
+            info.config(text="Decomposing Image: Tile " + str(done) + "/" + str(done + len(boxes) + len(pending)))
+            window.update_idletasks()
+
+    #Normalize the blend and derive the residual one band of rows at a time
+    for y0 in range(0, height, tile):
+        y1 = min(y0 + tile, height)
+        alb[y0:y1] /= weight[y0:y1, :, None]
+        dif[y0:y1] /= weight[y0:y1, :, None]
+        res[y0:y1] = (img[y0:y1] / np.float32(255)) ** 2.2 - alb[y0:y1] * dif[y0:y1]
+    weight._mmap.close()
+    del weight
+    os.remove(os.path.join(out_dir, 'weight.npy'))
+    alb.flush()
+    dif.flush()
+    res.flush()
+    return alb, dif, res
+
+def reconstruct(alb, dif, res):
+    """Recombines decomposition layers into a gamma corrected uint8 image"""
+    #recon = res + cg.view(alb*dif)
+    recon = alb * dif + res
+    recon = recon ** (1/2.2) #gamma correct
+    recon = np.clip(recon, 0, 1) #Clip result
+    return (recon * 255).astype(np.uint8)
+
+def logo_rect(scale=None):
+    """
+    Returns the bounding box (x0, y0, x1, y1) of the placed logo in target
+    pixels, uses the current logo scale unless one is given
+    """
+    if scale is None:
+        scale = logo_scale
+    h, w = logo_sprite.shape[:2]
+    w, h = max(1, round(w * scale)), max(1, round(h * scale))
+    x0, y0 = round(logo_center[0] - w / 2), round(logo_center[1] - h / 2)
+    return x0, y0, x0 + w, y0 + h
+
+def scaled_logo():
+    """Returns the logo resized to the current scale, resizes are cached"""
+    global logo_cache
+    if logo_cache[0] != logo_scale:
+        x0, y0, x1, y1 = logo_rect()
+        logo_cache = (logo_scale, cv2.resize(logo_sprite, (x1 - x0, y1 - y0), interpolation=cv2.INTER_LINEAR))
+    return logo_cache[1]
+
+def recomposite(x0, y0, x1, y1):
+    """
+    Recomputes the final image inside the rectangle (x0, y0, x1, y1) only
+    The logo is alpha composited onto the stored albedo where it overlaps the
+    rectangle and the layers are reconstructed for those pixels alone
+    The matching part of the preview is updated as well
+    """
+    alb, dif, res = decomp
+    height, width = final_img.shape[:2]
+    x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x1, width), min(y1, height)
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    #Alpha composite the part of the logo that lies in the rectangle
+    a = alb[y0:y1, x0:x1].astype(np.float32)
+    lx0, ly0, lx1, ly1 = logo_rect()
+    ox0, oy0, ox1, oy1 = max(x0, lx0), max(y0, ly0), min(x1, lx1), min(y1, ly1)
+    if ox0 < ox1 and oy0 < oy1:
+        l_img = scaled_logo()[oy0 - ly0:oy1 - ly0, ox0 - lx0:ox1 - lx0]
+        alpha = l_img[..., 3:]
+        region = a[oy0 - y0:oy1 - y0, ox0 - x0:ox1 - x0]
+        region[:] = region*(1-alpha) + l_img[..., :3]*(alpha)
+
+    final_img[y0:y1, x0:x1] = reconstruct(a, dif[y0:y1, x0:x1], res[y0:y1, x0:x1])
+    update_preview(x0, y0, x1, y1)
+
+def update_preview(x0, y0, x1, y1):
+    """
+    Updates the preview pixels covering the rectangle (x0, y0, x1, y1) of the
+    final image and redisplays it. Every preview pixel is the mean of the same
+    block of final image pixels no matter which rectangle it is updated from
+    """
+    global preview_img
+    height, width = final_img.shape[:2]
+    ph, pw = preview_arr.shape[:2]
+    per = pw / width
+    px0, py0 = int(x0 * per), int(y0 * per)
+    px1, py1 = min(pw, int(np.ceil(x1 * per))), min(ph, int(np.ceil(y1 * per)))
+    if px0 < px1 and py0 < py1:
+        #Block of final image pixels under each preview pixel
+        xs = np.arange(px0, px1)
+        ys = np.arange(py0, py1)
+        xs0, ys0 = (xs / per).astype(int), (ys / per).astype(int)
+        xs1 = np.minimum(np.maximum(((xs + 1) / per).astype(int), xs0 + 1), width)
+        ys1 = np.minimum(np.maximum(((ys + 1) / per).astype(int), ys0 + 1), height)
+        sx0, sy0 = xs0[0], ys0[0]
+
+        #Block sums from an integral image of the affected area
+        sums = np.zeros((ys1[-1] - sy0 + 1, xs1[-1] - sx0 + 1, 3))
+        sums[1:, 1:] = final_img[sy0:ys1[-1], sx0:xs1[-1]].cumsum(axis=0).cumsum(axis=1)
+        xs0, xs1, ys0, ys1 = xs0 - sx0, xs1 - sx0, ys0 - sy0, ys1 - sy0
+        block = (sums[ys1][:, xs1] - sums[ys0][:, xs1] - sums[ys1][:, xs0] + sums[ys0][:, xs0])
+        block = block / ((ys1 - ys0)[:, None, None] * (xs1 - xs0)[None, :, None])
+        preview_arr[py0:py1, px0:px1] = np.round(block).astype(np.uint8)
+    preview_img = ImageTk.PhotoImage(Image.fromarray(preview_arr))
+    panel.config(image=preview_img)
+
+def place_logo(center, scale):
+    """
+    Moves and scales the logo, then recomputes only the union of
+    the old and new logo bounding boxes
+    """
+    global logo_center, logo_scale
+    ox0, oy0, ox1, oy1 = logo_rect()
+    logo_center, logo_scale = center, scale
+    nx0, ny0, nx1, ny1 = logo_rect()
+    recomposite(min(ox0, nx0), min(oy0, ny0), max(ox1, nx1), max(oy1, ny1))
+
+def crop_logo(img):
+    """
+    Crops an RGBA logo to the bounding box of its visible pixels
+    Returns the cropped logo as floats and its box (x0, y0, x1, y1)
+    or None and an empty box if the logo is fully transparent
+    """
+    l_img = np.asarray(img)
+    ys, xs = np.nonzero(l_img[..., 3])
+    if len(xs) == 0:
+        return None, (0, 0, 0, 0)
+    x0, y0, x1, y1 = xs.min(), ys.min(), xs.max() + 1, ys.max() + 1
+    return l_img[y0:y1, x0:x1].astype(np.float32) /255, (x0, y0, x1, y1)
+
 def composite():
     """
     Decomposes the target image into albedo, shading, and residual
     Then alpha composites the logo with the albedo before reconstructing the image
+    The decomposition is kept so the logo can be moved afterwards and
+    so a new logo for the same target does not decompose it again
     On success image is saved in global variable and preview is displayed
     On fail error message is displayed
     """
@@ -186,65 +863,265 @@ def composite():
         return
 
     #Perform Intrinsic Decomposition
-    info.config(text="Decomposing Image")
-    i_img = np.array(target_img).astype(np.single)
-    i_img = i_img / float((2 ** 8) - 1)
-    decomp_results = run_pipeline(int_model,i_img,device='cuda',resize_conf=None,linear=False)
-    alb = decomp_results['hr_alb']
-    dif = decomp_results['dif_shd']
-    res = decomp_results['residual']
+    global decomp
+    if decomp is None:
+        info.config(text="Decomposing Image")
+        decomp = decompose(target_img)
+    alb = decomp[0]
 
-    #Alpha composite logo onto albedo
-    #Convert albedo to PIL format, add alpha to logo and then composite
+    #Crop logo to its visible pixels so moving it only touches that area
     info.config(text="Compositing Logo")
+    global logo_sprite, logo_center, logo_scale, logo_cache
+    logo_sprite, (x0, y0, x1, y1) = crop_logo(logo_img)
+    if logo_sprite is None:
+        info.config(text="Error: Logo Image Is Fully Transparent")
+        return
+    logo_center = ((x0 + x1) / 2, (y0 + y1) / 2)
+    logo_scale = 1.0
+    logo_cache = (None, None)
 
-    #Resize logo
-    alb_tmp = Image.fromarray(np.uint8(alb * 255))
-    l_img = logo_img.resize(alb_tmp.size)
-    l_img = np.asarray(l_img).astype(np.float32) /255
-
-    #Alpha composite
-    alpha = l_img[...,3]
-    alpha = np.stack((alpha,alpha,alpha),axis=2)
-    l_img = l_img[...,:3]
-    alb = alb*(1-alpha) + l_img*(alpha)
+    #Reconstruct the whole image once
+    info.config(text="Reconstructing Image")
+    global final_img, preview_arr
+    height, width = alb.shape[:2]
+    final_img = np.zeros((height, width, 3), dtype=np.uint8)
+    preview_arr = np.zeros((int(height * 300 / width), 300, 3), dtype=np.uint8)
+    #Work in bands of rows to bound memory on large images
+    for y0 in range(0, height, TILE_SIZE):
+        recomposite(0, y0, width, y0 + TILE_SIZE)
+    info.config(text="Compositing Complete. Drag To Move Logo, Scroll To Scale")
 
-    #Convert albedo back to array
-    alb = np.asarray(alb)
-    alb = alb[:,:,0:3]
+def preview_to_target(event):
+    """Converts mouse coordinates on the preview into target image pixels"""
+    ph, pw = preview_arr.shape[:2]
+    per = pw / final_img.shape[1]
+    x = event.x - (panel.winfo_width() - pw) / 2
+    y = event.y - (panel.winfo_height() - ph) / 2
+    return x / per, y / per
 
-    #Composite Remaining Layers
-    info.config(text="Reconstructing Image")
-    #recon = res + cg.view(alb*dif)
-    recon = alb * dif + res
-    recon = recon ** (1/2.2) #gamma correct
-    recon = np.clip(recon, 0, 1) #Clip result
+def drag_start(event):
+    """Remembers where a drag of the logo started"""
+    global drag_pos
+    if final_img is None:
+        return
+    drag_pos = preview_to_target(event)
 
-    #Convert to image format
-    recon = Image.fromarray((recon * 255).astype(np.uint8))
-    global final_img
-    final_img = recon
+def drag_logo(event):
+    """Moves the logo along with the mouse while dragging"""
+    global drag_pos
+    if final_img is None or drag_pos is None:
+        return
+    x, y = preview_to_target(event)
+    center = (logo_center[0] + x - drag_pos[0], logo_center[1] + y - drag_pos[1])
+    drag_pos = (x, y)
+    place_logo(center, logo_scale)
 
-    #Display preview of result
-    global preview_img
-    preview_img = img_resize(recon)
-    panel.config(image=preview_img)
-    info.config(text="Compositing Complete")
+def scale_logo(event):
+    """
+    Scales the logo around its center with the mouse wheel
+    The scale is kept between one pixel and the size of the target
+    so the resized logo stays bounded in memory
+    """
+    if final_img is None:
+        return
+    if event.num == 4 or event.delta > 0:
+        scale = logo_scale * LOGO_SCALE_STEP
+    else:
+        scale = logo_scale / LOGO_SCALE_STEP
+    h, w = logo_sprite.shape[:2]
+    height, width = final_img.shape[:2]
+    scale = min(max(scale, 1 / min(w, h)), width / w, height / h)
+    if scale == logo_scale:
+        return
+    place_logo(logo_center, scale)
 
 def save_img():
     """
     Prompts user to save the final image
     """
     #Check that final image is constructed
-    if final_img == None:
+    if final_img is None:
         info.config(text="Error: Composite Image First")
         return
     #Get save path from user and then save
     info.config(text="Saving Image")
     save_path = fd.asksaveasfilename(initialfile='Untitled.png',defaultextension='png',filetypes=[("png","*.png"),("jpg","*.jpg")])
-    final_img.save(save_path)
+    Image.fromarray(final_img).save(save_path)
     info.config(text="Image Saved")
 
+def read_frames(fp, skipped):
+    """
+    Reads a video file, or the image sequence that fp belongs to, one frame
+    at a time. An image sequence is every image in the folder of fp with the
+    same extension, in name order
+    Images that cannot be read are skipped and their names added to skipped
+    Yields the name and RGB array of each frame
+    """
+    folder, name = os.path.split(fp)
+    ext = os.path.splitext(name)[1].lower()
+    if ext in SEQUENCE_IMAGE_EXTS:
+        for name in sorted(f for f in os.listdir(folder) if os.path.splitext(f)[1].lower() == ext):
+            frame = cv2.imread(os.path.join(folder, name))
+            if frame is None:
+                skipped.append(name)
+                continue
+            yield os.path.splitext(name)[0], cv2.cvtColor(frame,cv2.COLOR_BGR2RGB)
+        return
+    cap = cv2.VideoCapture(fp)
+    i = 0
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield "frame_%05d" % i, cv2.cvtColor(frame,cv2.COLOR_BGR2RGB)
+        i += 1
+    cap.release()
+
+def frame_thumbnail(frame):
+    """Returns a small grayscale copy of a frame used to measure scene change"""
+    height, width = frame.shape[:2]
+    size = (SEQUENCE_THUMB_WIDTH, max(1, round(height * SEQUENCE_THUMB_WIDTH / width)))
+    return cv2.resize(cv2.cvtColor(frame,cv2.COLOR_RGB2GRAY), size, interpolation=cv2.INTER_AREA).astype(np.float32) / 255
+
+def sequence_layers(frames, save_dir):
+    """
+    Decomposes a stream of frames, running MoGe and intrinsic decomposition
+    on keyframes only. A frame becomes a keyframe when it differs from the
+    last keyframe by more than SEQUENCE_KEY_THRESHOLD or when
+    SEQUENCE_MAX_KEY_INTERVAL frames have passed since it
+    Frames in between reuse the albedo and shading of their keyframe, their
+    residual is left as None to be derived from the frame itself
+    The mesh of each keyframe is saved to save_dir
+    Yields (name, frame, alb, dif, res, fov) per frame, fov is None
+    for frames that are not keyframes
+    """
+    key_thumb = None
+    since_key = 0
+    layers = None
+    try:
+        for name, frame in frames:
+            thumb = frame_thumbnail(frame)
+            if key_thumb is None or since_key >= SEQUENCE_MAX_KEY_INTERVAL or np.abs(thumb - key_thumb).mean() > SEQUENCE_KEY_THRESHOLD:
+                #Layers of the previous keyframe are no longer needed
+                release_layers(layers)
+                layers = decompose(frame)
+                alb, dif, res = layers
+                output = moge_model.infer(image_to_tensor(frame))
+                points, depth, mask, intrinsics = output['points'].cpu().numpy(), output['depth'].cpu().numpy(), output['mask'].cpu().numpy(), output['intrinsics'].cpu().numpy()
+                fov = save_batch_mesh(save_dir, name, frame, points, depth, mask, intrinsics)
+                key_thumb = thumb
+                since_key = 0
+                yield name, frame, alb, dif, res, fov
+            else:
+                yield name, frame, alb, dif, None, None
+            since_key += 1
+    finally:
+        release_layers(layers)
+
+def composite_frame(frame, alb, dif, res, sprite, box):
+    """
+    Composites the cropped logo onto one frame of a sequence
+    Only the logo box is reconstructed, the rest of the frame is copied
+    When res is None the residual is taken as whatever the reused albedo and
+    shading do not explain in this frame, so the frame is kept intact
+    """
+    x0, y0, x1, y1 = box
+    a = alb[y0:y1, x0:x1].astype(np.float32)
+    d = dif[y0:y1, x0:x1]
+    if res is None:
+        r = (frame[y0:y1, x0:x1] / np.float32(255)) ** 2.2 - a * d
+    else:
+        r = res[y0:y1, x0:x1]
+    alpha = sprite[..., 3:]
+    a = a*(1-alpha) + sprite[..., :3]*(alpha)
+    out = frame.copy()
+    out[y0:y1, x0:x1] = reconstruct(a, d, r)
+    return out
+
+def composite_sequence():
+    """
+    Composites the loaded logo into every frame of a video or image sequence
+    Frames are streamed, so only the current keyframe layers and a few frames
+    waiting to be written are held in memory
+    Composited frames and keyframe meshes are written to the selected folder
+    as they are produced, with keyframe FOVs in fov.txt
+    """
+    if logo_img == None:
+        info.config(text="Error: Please Load Logo Image First")
+        return
+    l_img = np.asarray(logo_img)
+    if l_img.ndim != 3 or l_img.shape[2] != 4:
+        info.config(text="Error: Logo Image Should Include Transparency")
+        return
+    sprite, box = crop_logo(logo_img)
+    if sprite is None:
+        info.config(text="Error: Logo Image Is Fully Transparent")
+        return
+    fp = fd.askopenfilename()
+    if not fp:
+        info.config(text="Error: No Video Or Image Sequence Selected")
+        return
+    save_dir = fd.askdirectory()
+    if not save_dir:
+        info.config(text="Error: No Save Folder Selected")
+        return
+
+    #Check the first frame before any model is run
+    skipped = []
+    frames = read_frames(fp, skipped)
+    first = next(frames, None)
+    if first is None:
+        info.config(text="Error: No Frames Could Be Read")
+        return
+    if first[1].shape[:2] != logo_img.size[::-1]:
+        info.config(text="Error: Logo Image Should be Same Size As Frames")
+        return
+
+    count = 0
+    keys = 0
+    pending = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=1) as pool, open(os.path.join(save_dir, 'fov.txt'), 'w') as fov_file:
+        for name, frame, alb, dif, res, fov in sequence_layers(itertools.chain([first], frames), save_dir):
+            if frame.shape[:2] != logo_img.size[::-1]:
+                info.config(text="Error: Logo Image Should be Same Size As Frames")
+                return
+            out = composite_frame(frame, alb, dif, res, sprite, box)
+            pending.append((name, pool.submit(cv2.imwrite, os.path.join(save_dir, name + '.png'), cv2.cvtColor(out,cv2.COLOR_RGB2BGR))))
+            #Bound the number of frames waiting to be written
+            while len(pending) > SEQUENCE_MAX_PENDING:
+                written, future = pending.pop(0)
+                if not future.result():
+                    info.config(text="Error: Could Not Write Frame " + written)
+                    return
+            count += 1
+            if fov is not None:
+                keys += 1
+                fov_file.write(name + " " + str(fov) + "\n")
+            text = "Frame " + str(count) + ": " + str(round(count / (time.perf_counter() - start), 2)) + " fps"
+            if skipped:
+                text += ", " + str(len(skipped)) + " Unreadable Skipped"
+            info.config(text=text)
+            window.update_idletasks()
+        for written, future in pending:
+            if not future.result():
+                info.config(text="Error: Could Not Write Frame " + written)
+                return
+    total_time = time.perf_counter() - start
+
+    text = (str(count) + " Frames Saved. " + str(round(count / total_time, 2)) + " fps, "
+            + str(keys) + " Keyframes (" + str(round(100 * keys / count, 1)) + "%)")
+    if skipped:
+        text += "\n" + str(len(skipped)) + " Unreadable Frames Skipped: " + ", ".join(skipped[:5])
+    info.config(text=text)
+
+#Drag and scroll on the preview to place the logo
+panel.bind("<ButtonPress-1>",drag_start)
+panel.bind("<B1-Motion>",drag_logo)
+panel.bind("<MouseWheel>",scale_logo)
+panel.bind("<Button-4>",scale_logo)
+panel.bind("<Button-5>",scale_logo)
+
 #Define right column of GUI
 button_frame = ttk.Frame()
 button_frame.grid(row=0,column=1)
@@ -256,13 +1133,34 @@ button_img.grid(row=0,column=0,padx=5)
 button_geo = ttk.Button(button_frame,text="Build\nGeometry",command=build_geometry)
 button_geo.grid(row=1,column=0,padx=5)
 
+button_geo_batch = ttk.Button(button_frame,text="Build Geometry\nBatch",command=build_geometry_batch)
+button_geo_batch.grid(row=2,column=0,padx=5)
+
+batch_size_label = ttk.Label(button_frame,text="Batch Size")
+batch_size_label.grid(row=3,column=0,padx=5)
+
+batch_size_box = ttk.Spinbox(button_frame,from_=1,to=64,width=5)
+batch_size_box.set(4)
+batch_size_box.grid(row=4,column=0,padx=5)
+
+button_bench = ttk.Button(button_frame,text="Benchmark\nBatch Sizes",command=benchmark_batch_sizes)
+button_bench.grid(row=5,column=0,padx=5)
+
 button_logo = ttk.Button(button_frame,text="Load Logo",command=logo_get)
-button_logo.grid(row=2,column=0,padx=5)
+button_logo.grid(row=6,column=0,padx=5)
 
 button_composite = ttk.Button(button_frame,text="Composite\nImage",command=composite)
-button_composite.grid(row=3,column=0,padx=5)
+button_composite.grid(row=7,column=0,padx=5)
 
 button_save = ttk.Button(button_frame,text="Save Image",command=save_img)
-button_save.grid(row=4,column=0,padx=5)
+button_save.grid(row=8,column=0,padx=5)
+
+button_sequence = ttk.Button(button_frame,text="Composite\nSequence",command=composite_sequence)
+button_sequence.grid(row=9,column=0,padx=5)
+
+button_bench_mesh = ttk.Button(button_frame,text="Benchmark\nMeshing",command=benchmark_meshing)
+button_bench_mesh.grid(row=10,column=0,padx=5)
+
+atexit.register(cleanup_tiles)
 
 window.mainloop()